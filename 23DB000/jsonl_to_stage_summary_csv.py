@@ -1,76 +1,156 @@
-import json
 import csv
+import mmap
 import sys
 from pathlib import Path
 
-def main(jsonl_path: str):
-    p = Path(jsonl_path)
-    if not p.exists():
-        raise FileNotFoundError(p)
+try:
+    # orjson があれば使う（bytesを直接パースでき、標準jsonより数倍速い）
+    import orjson
+    _loads = orjson.loads
+    _DECODE_ERRORS = (orjson.JSONDecodeError,)
+except ImportError:
+    import json
+    _loads = json.loads
+    _DECODE_ERRORS = (json.JSONDecodeError, UnicodeDecodeError)
+
+class StageAgg:
+    """1ステージ分の集計値（dictより小さく、属性アクセスも速い）"""
+    __slots__ = ("chapter", "stage", "failures", "stalled_seconds", "completed")
+
+    def __init__(self, chapter, stage):
+        self.chapter = chapter
+        self.stage = stage
+        self.failures = 0
+        self.stalled_seconds = 0.0
+        self.completed = ""  # 最後のfinalizeのcompletedを入れる
+
+def handle_validate(ev, entry):
+    if ev.get("ok") is False:
+        entry.failures += 1
+
+def handle_finalize(ev, entry):
+    # finalize はそのステージのsetup→離脱/完了までの時間
+    # 戻り値は停滞時間の増分（合計をループ内で更新するため）
+    delta = 0.0
+    stalled = ev.get("stalled_seconds")
+    if stalled is not None:
+        stalled = float(stalled)
+        delta = stalled - entry.stalled_seconds
+        entry.stalled_seconds = stalled
+    comp = ev.get("completed")
+    if comp is not None:
+        # str(bool(comp)) と同じ結果を、毎回の変換なしで定数文字列から選ぶ
+        entry.completed = "True" if comp else "False"
+    return delta
+
+def handle_setup(ev, entry):
+    # setup は行を作るだけ（失敗0・停滞0のステージも出力に残す）
+    pass
 
-    rows = []
-    with p.open("r", encoding="utf-8") as f:
-        for line in f:
-            line = line.strip()
-            if not line:
+# event種別 → 集計関数（対象外のイベントは1回のdict参照で読み飛ばす）
+HANDLERS = {
+    "validate": handle_validate,
+    "finalize": handle_finalize,
+    "setup": handle_setup,
+}
+
+def iter_events(p: Path):
+    """対象イベントだけをパースして1件ずつ返す（読み込み側）"""
+    if p.stat().st_size == 0:
+        # 空ファイルはmmapできない
+        return
+    # mmapでOSに必要な分だけページインさせ、行区切りも対象イベントの判定も
+    # mm.find（C実装）で行う。対象外の行はbytesに切り出しすらしない
+    with p.open("rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        find = mm.find
+        n = len(mm)
+        i = 0
+        while i < n:
+            j = find(b"\n", i)
+            if j == -1:
+                j = n
+            start, i = i, j + 1
+            # 対象イベント名を含まない行（空行含む）はパースしない（誤検出はHANDLERSで弾かれる）
+            if (find(b'"validate"', start, j) == -1
+                    and find(b'"finalize"', start, j) == -1
+                    and find(b'"setup"', start, j) == -1):
                 continue
             try:
-                rows.append(json.loads(line))
-            except json.JSONDecodeError:
+                ev = _loads(mm[start:j])
+            except _DECODE_ERRORS:
                 # 末尾が壊れている（クラッシュ等）場合でも復旧できるように無視
                 continue
+            yield ev
 
-    # stage単位に集計
+def aggregate(events):
+    """イベント列をstage単位に畳み込む（集計側）。(by_stage, total_time) を返す"""
     by_stage = {}
-    for ev in rows:
-        if ev.get("event") not in ("validate", "finalize", "setup"):
+    total_time = 0.0
+    # ループ内で使う名前はローカルに束縛しておく
+    get_entry = by_stage.get
+    get_handler = HANDLERS.get
+    _int = int
+    for ev in events:
+        get = ev.get
+        handler = get_handler(get("event"))
+        if handler is None:
             continue
-        ch = ev.get("chapter")
-        st = ev.get("stage")
+        ch = get("chapter")
+        st = get("stage")
         if ch is None or st is None:
             continue
-        key = (int(ch), int(st))
-        by_stage.setdefault(key, {
-            "chapter": int(ch),
-            "stage": int(st),
-            "failures": 0,
-            "stalled_seconds": 0.0,
-            "completed": "",  # 最後のfinalizeのcompletedを入れる
-        })
-
-        if ev.get("event") == "validate":
-            if ev.get("ok") is False:
-                by_stage[key]["failures"] += 1
-
-        if ev.get("event") == "finalize":
-            # finalize はそのステージのsetup→離脱/完了までの時間
-            stalled = ev.get("stalled_seconds")
-            if stalled is not None:
-                by_stage[key]["stalled_seconds"] = float(stalled)
-            comp = ev.get("completed")
-            if comp is not None:
-                by_stage[key]["completed"] = str(bool(comp))
+        ch = _int(ch)
+        st = _int(st)
+        # (chapter, stage) をタプルではなく1つのintにまとめる（章<=6・ステージ<=10なので8bitで足りる）
+        # 大小関係も (chapter, stage) の順と一致するので、そのままソートに使える
+        key = (ch << 8) | st
+        entry = get_entry(key)
+        if entry is None:
+            # 既存キーでは集計オブジェクトを作らない
+            entry = by_stage[key] = StageAgg(ch, st)
+        delta = handler(ev, entry)
+        if delta:
+            total_time += delta
+    return by_stage, total_time
+
+def main(jsonl_path: str):
+    p = Path(jsonl_path)
+    if not p.exists():
+        raise FileNotFoundError(p)
+
+    # stage単位に集計（読み込みながら逐次集計し、イベントは保持しない）
+    by_stage, total_time = aggregate(iter_events(p))
 
     # 出力（ステージ順）
     out_csv = p.with_suffix(".stage_summary.csv")
-    stage_keys = sorted(by_stage.keys())
 
-    total_time = sum(by_stage[k]["stalled_seconds"] for k in stage_keys)
-
-    with out_csv.open("w", encoding="utf-8", newline="") as f:
+    with out_csv.open("w", encoding="utf-8", newline="", buffering=1 << 20) as f:
         w = csv.writer(f)
         w.writerow(["participant_file", str(p.name)])
         w.writerow(["total_stalled_seconds", f"{total_time:.3f}"])
         w.writerow([])
         w.writerow(["chapter", "stage", "failures", "stalled_seconds", "completed"])
-        for k in stage_keys:
-            r = by_stage[k]
-            w.writerow([r["chapter"], r["stage"], r["failures"], f"{r['stalled_seconds']:.3f}", r["completed"]])
+        # 集計行は数値と"True"/"False"/""だけで引用符が不要なので、csv.writerを通さず
+        # 行文字列を組み立てて1回でwriteする（改行はcsv.writerの既定に合わせて\r\n）
+        f.write("".join([
+            f"{r.chapter},{r.stage},{r.failures},{r.stalled_seconds:.3f},{r.completed}\r\n"
+            for _key, r in sorted(by_stage.items())
+        ]))
 
     print(f"written: {out_csv}")
 
+def main_many(paths):
+    # 参加者ごとのファイルは互いに独立なので、プロセスを分けて並列に集計する
+    from multiprocessing import Pool
+    with Pool() as pool:
+        pool.map(main, paths)
+
 if __name__ == "__main__":
     if len(sys.argv) != 2:
-        print("usage: python jsonl_to_stage_summary_csv.py <participant_log.jsonl>")
+        print("usage: python jsonl_to_stage_summary_csv.py <participant_log.jsonl | log_dir>")
         raise SystemExit(2)
-    main(sys.argv[1])
\ No newline at end of file
+    target = Path(sys.argv[1])
+    if target.is_dir():
+        main_many(sorted(str(x) for x in target.glob("*.jsonl")))
+    else:
+        main(sys.argv[1])
@@ -18,7 +18,15 @@ import os
 import csv
 import subprocess
 import sys
-from mathutils import Vector
+import stat
+import atexit
+import base64
+import re
+import collections
+import functools
+import numpy as np
+from pathlib import Path
+from bpy.app.handlers import persistent
 from bpy.types import Operator, Panel, PropertyGroup
 from bpy.props import (
     IntProperty,
@@ -29,13 +37,139 @@ from bpy.props import (
     StringProperty,
 )
 
-# =====================================================
-# VERTEX POSITION STORAGE
-# =====================================================
+_RAD2DEG = 180.0 / math.pi
+
+# JSONL (de)serializer: orjson if bundled (works on UTF-8 bytes directly), stdlib json otherwise
+try:
+    import orjson
+    _dumps = orjson.dumps
+    _loads = orjson.loads
+except ImportError:
+    def _dumps(obj):
+        return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    _loads = json.loads
+
+# orjson.JSONDecodeError subclasses json.JSONDecodeError; stdlib json.loads(bytes)
+# raises UnicodeDecodeError on a line cut mid-character
+_JSON_LINE_ERRORS = (json.JSONDecodeError, UnicodeDecodeError)
+
+def _iter_lines_chunked(f, chunk_size=1 << 20):
+    """Yield lines (without b"\\n") from a binary file read in large chunks."""
+    tail = b""
+    while True:
+        buf = f.read(chunk_size)
+        if not buf:
+            break
+        *lines, tail = (tail + buf).split(b"\n")
+        yield from lines
+    if tail:
+        yield tail
+
+def _aggregate_jsonl(jsonl_path):
+    """Fold one participant log into per-stage failures/stalled/completed.
+
+    Returns (by_stage, total_stalled); by_stage is keyed by (chapter, stage).
+    """
+    # Single pass without keeping the events: failures are counted per stage, and for
+    # finalize only the last non-null stalled/completed per stage is kept
+    failures = collections.Counter()
+    last_stalled = {}
+    last_completed = {}
+    # names used on every line, bound locally
+    loads = _loads
+    errors = _JSON_LINE_ERRORS
+    wanted = ("validate", "finalize")
+    _int = int
+    # binary mode: the parser decodes UTF-8 itself
+    with open(jsonl_path, "rb") as f:
+        for line in _iter_lines_chunked(f):
+            if not line.strip():
+                continue
+            try:
+                ev = loads(line)
+            except errors:
+                continue
 
-class VertexPos(PropertyGroup):
-    """Store vertex position for comparison"""
-    co: FloatVectorProperty(size=3)
+            get = ev.get
+            ev_type = get("event")
+            if ev_type not in wanted:
+                continue
+            ch = get("chapter")
+            st = get("stage")
+            if ch is None or st is None:
+                continue
+            key = (_int(ch), _int(st))
+            if ev_type == "validate":
+                # ok=False adds 1; any other validate still registers the stage with 0
+                failures[key] += get("ok") is False
+            else:
+                failures[key] += 0
+                stalled = get("stalled_seconds")
+                if stalled is not None:
+                    last_stalled[key] = float(stalled)
+                completed = get("completed")
+                if completed is not None:
+                    last_completed[key] = bool(completed)
+
+    by_stage = {
+        key: {"chapter": key[0], "stage": key[1], "failures": n,
+              "stalled_seconds": last_stalled.get(key), "completed": last_completed.get(key)}
+        for key, n in failures.items()
+    }
+    return by_stage, _total_stalled(by_stage)
+
+def _fold_stage_event(by_stage, ev):
+    """Apply one logged event to a by_stage dict, with the same rules as _aggregate_jsonl."""
+    ev_type = ev.get("event")
+    if ev_type not in ("validate", "finalize"):
+        return
+    ch = ev.get("chapter")
+    st = ev.get("stage")
+    if ch is None or st is None:
+        return
+    key = (int(ch), int(st))
+    r = by_stage.get(key)
+    if r is None:
+        r = by_stage[key] = {"chapter": key[0], "stage": key[1], "failures": 0, "stalled_seconds": None, "completed": None}
+    if ev_type == "validate":
+        if ev.get("ok") is False:
+            r["failures"] += 1
+    else:
+        if ev.get("stalled_seconds") is not None:
+            r["stalled_seconds"] = float(ev["stalled_seconds"])
+        if ev.get("completed") is not None:
+            r["completed"] = bool(ev["completed"])
+
+def _total_stalled(by_stage):
+    total_stalled = 0.0
+    for r in by_stage.values():
+        if isinstance(r["stalled_seconds"], (int, float)):
+            total_stalled += float(r["stalled_seconds"])
+    return total_stalled
+
+def _stage_summary_rows(by_stage):
+    """CSV data rows (chapter, stage, failures, stalled, completed) in stage order."""
+    rows = []
+    for key in sorted(by_stage.keys()):
+        r = by_stage[key]
+        stalled = r["stalled_seconds"]
+        stalled_str = f"{stalled:.3f}" if isinstance(stalled, (int, float)) else ""
+        completed_str = "" if r["completed"] is None else str(r["completed"])
+        rows.append([r["chapter"], r["stage"], r["failures"], stalled_str, completed_str])
+    return rows
+
+# Constant for the whole process; used in the session_start record
+_BLENDER_VERSION_STR = ".".join(map(str, bpy.app.version))
+# SAFE: bl_info may not exist depending on load/reload context
+_ADDON_VERSION_STR = ".".join(map(str, (globals().get("bl_info", {}) or {}).get("version", (0, 0, 0))))
+
+_PID_UNSAFE_RE = re.compile(r"[^\w-]")
+
+# bpy.path.abspath results per raw path; "//" paths depend on the .blend location,
+# so the cache is cleared on load/save
+@functools.lru_cache(maxsize=16)
+def _abspath(path: str) -> str:
+    return bpy.path.abspath(path)
 
 # =====================================================
 # RESEARCH DATA STORAGE (SESSION-IN-MEMORY)
@@ -55,6 +189,93 @@ class StageRun(PropertyGroup):
     started_at: FloatProperty(default=0.0)
     ended_at: FloatProperty(default=0.0)
 
+# UI stage descriptions, keyed by (chapter, stage); built once at import
+_STAGE_INFO = {
+    (1, 1): {"title": "第1章: 基本操作", "name": "ステージ1: キューブを選択",
+        "description": "キューブを選択してください", "details": "1. オブジェクトを右クリックしよう"},
+    (1, 2): {"title": "第1章: 基本操作", "name": "ステージ2: キューブを移動",
+        "description": "X軸方向に+2移動", "details": "2. Gキー → Xキー → 2 → Enter"},
+    (1, 3): {"title": "第1章: 基本操作", "name": "ステージ3: キューブを回転",
+        "description": "X軸周りに45度回転", "details": "3. Rキー → Xキー → 45 → Enter"},
+    (1, 4): {"title": "第1章: 基本操作", "name": "ステージ4: スケール変更",
+        "description": "サイズを変更", "details": "4. Sキーでスケール → Enterで確定"},
+    (2, 1): {"title": "第2章: ビュー操作", "name": "ステージ1: ビューを移動",
+        "description": "Shift + 中ボタンでパン"},
+    (2, 2): {"title": "第2章: ビュー操作", "name": "ステージ2: ズーム",
+        "description": "中ボタンスクロール"},
+    (2, 3): {"title": "第2章: ビュー操作", "name": "ステージ3: ビュー回転",
+        "description": "中ボタンドラッグ"},
+    (2, 4): {"title": "第2章: ビュー操作", "name": "ステージ4: すべてマスター",
+        "description": "すべての操作を実行"},
+    (3, 1): {"title": "第3章: モデリング基礎", "name": "ステージ1: エディットモード",
+        "description": "Tab キーで切り替え"},
+    (3, 2): {"title": "第3章: モデリング基礎", "name": "ステージ2: 頂点選択",
+        "description": "3個以上の頂点を選択"},
+    (3, 3): {"title": "第3章: モデリング基礎", "name": "ステージ3: エッジ選択",
+        "description": "エッジを選択"},
+    (3, 4): {"title": "第3章: モデリング基礎", "name": "ステージ4: フェース選択",
+        "description": "フェースを選択"},
+    (3, 5): {"title": "第3章: モデリング基礎", "name": "ステージ5: エクストルード",
+        "description": "E キーで押し出し"},
+    (3, 6): {"title": "第3章: モデリング基礎", "name": "ステージ6: ループカット",
+        "description": "Ctrl+R でループカット"},
+    (4, 1): {"title": "第4章: スカルプティング体験", "name": "ステージ1: スカルプトモード",
+        "description": "Sculpt Mode に入ってください"},
+    (4, 2): {"title": "第4章: スカルプティング体験", "name": "ステージ2: Draw ブラシを使う",
+        "description": "Draw ブラシで球の表面を変形"},
+    (4, 3): {"title": "第4章: スカルプティング体験", "name": "ステージ3: Smooth ブラシに切り替え",
+        "description": "Smooth ブラシを選択してください"},
+    (4, 4): {"title": "第4章: スカルプティング体験", "name": "ステージ4: Grab ブラシに切り替え",
+        "description": "Grab ブラシを選択してください"},
+    (5, 1): {"title": "第5章: マテリアルノード", "name": "ステージ1: マテリアル作成",
+        "description": "「新規」ボタンを押す"},
+    (5, 2): {"title": "第5章: マテリアルノード", "name": "ステージ2: 色変更",
+        "description": "Base Color を変更"},
+    (5, 3): {"title": "第5章: マテリアルノード", "name": "ステージ3: 画像テクスチャ追加",
+        "description": "追加 → 画像テクスチャで画像読み込み"},
+    (5, 4): {"title": "第5章: マテリアルノード", "name": "ステージ4: ノード接続",
+        "description": "ImageTexture → BaseColor に接続"},
+    (5, 5): {"title": "第5章: マテリアルノード", "name": "ステージ5: 質感調整",
+        "description": "Roughness または Metallic を変更"},
+    (6, 1): {
+        "title": "第6章: 最終制作",
+        "name": "ステージ1: 自由制作→レンダー保存（のみ）",
+        "description": "自由に作品を作って、Render Result から画像を保存してください",
+        "details": "セットアップ時にカメラとSunライトを自動生成します。\n"
+                   "カメラ位置: X=10m, Y=-4m, Z=4.5m\n"
+                   "カメラ回転: X=63°, Y=0°, Z=66°\n"
+                   "Sun: Energy=1000\n\n"
+                   "F12でレンダー → Render Result で Image > Save As...\n"
+                   "（補助ボタンで自動保存も可能）",
+    },
+}
+
+# Number of hints shown after 0, 1, 2, 3+ failed validations
+_HINT_ESCALATION = (1, 1, 2, 3)
+
+# Number of stages per chapter, indexed by chapter (index 0 unused)
+_MAX_STAGES = (0, 4, 4, 6, 4, 5, 1)
+
+# Chapter button labels for the panel
+_CH_LABELS = tuple(f"第{i}章" for i in range(1, 7))
+
+# Fixed validation results, built once instead of per check
+_VALIDATION_UNKNOWN = (False, "❌ 判定エラー", "UNKNOWN", ("セットアップして再試行",))
+_CH6_NOT_SAVED = (False, "❌ まだ保存が検出できません", "RENDER_NOT_SAVED", (
+    "F12 でレンダー → Render Result で Image > Save As...",
+    "（補助:「補助: レンダーして保存（自動）」でもOK）",
+))
+
+# Chapter 6 camera/sun defaults, with the radians precomputed
+_CH6_ROT_DEG = (63.0, 0.0, 66.0)
+_CH6_ROT_RAD = tuple(math.radians(v) for v in _CH6_ROT_DEG)
+
+def _ch6_rotation_rad(rotation_deg=None):
+    """Euler radians for rotation_deg; None means the Chapter 6 default (precomputed)."""
+    if rotation_deg is None:
+        return _CH6_ROT_RAD
+    return tuple(math.radians(v) for v in rotation_deg)
+
 # =====================================================
 # STAGE MANAGER
 # =====================================================
@@ -73,15 +294,13 @@ class StageManager:
 
     @staticmethod
     def vec_dist(a, b):
-        return math.sqrt(sum((a[i] - b[i]) ** 2 for i in range(3)))
+        return math.hypot(a[0] - b[0], a[1] - b[1], a[2] - b[2])
 
     @staticmethod
     def rot_dist_deg(a_rad, b_rad):
         """Rough per-axis rotation distance in degrees (Euler)."""
         try:
-            a_deg = tuple(math.degrees(v) for v in a_rad)
-            b_deg = tuple(math.degrees(v) for v in b_rad)
-            return sum(abs(a_deg[i] - b_deg[i]) for i in range(3))
+            return (abs(a_rad[0] - b_rad[0]) + abs(a_rad[1] - b_rad[1]) + abs(a_rad[2] - b_rad[2])) * _RAD2DEG
         except Exception:
             return 9999.0
 
@@ -96,10 +315,23 @@ class StageManager:
 
     @staticmethod
     def ensure_dir_exists(path: str) -> str:
-        abs_path = bpy.path.abspath(path)
+        abs_path = _abspath(path)
         os.makedirs(abs_path, exist_ok=True)
         return abs_path
 
+    # (raw log_dir, resolved + created folder); reset by the log_dir update callback
+    _log_dir_abs = ("", "")
+
+    @staticmethod
+    def get_log_dir_abs(props) -> str:
+        """Resolved log folder, created if needed; resolved again only after log_dir changes."""
+        raw = props.log_dir or StageManager.default_log_dir()
+        cached_raw, abs_dir = StageManager._log_dir_abs
+        if not abs_dir or cached_raw != raw:
+            abs_dir = StageManager.ensure_dir_exists(raw)
+            StageManager._log_dir_abs = (raw, abs_dir)
+        return abs_dir
+
     @staticmethod
     def open_folder_in_os(path: str):
         abs_path = StageManager.ensure_dir_exists(path)
@@ -113,29 +345,115 @@ class StageManager:
     # -----------------------------
     # Participant log (JSONL)
     # -----------------------------
+    # Kept open between events; reopened only when the log path changes
+    _log_fh = None
+    _log_fh_path = None
+    # (raw participant_log_path, resolved path); resolved once per log instead of per event
+    _cached_abs_log_path = ("", "")
+    # participant_log_path already checked (folder + file) for this session; reset when the
+    # participant ID / log folder is edited or the handle is closed
+    _log_ready_for_path = ""
+    # Stage summary of the log at _by_stage_path, kept up to date as events are appended,
+    # so the CSV export does not have to re-read the file written by this session
+    _by_stage = {}
+    _by_stage_path = None
+    # Serialized events waiting to be written in one batch; written once they
+    # reach 64 KiB or more than 1 s has passed since the last flush
+    _pending = collections.deque()
+    _pending_bytes = 0
+    _last_flush = 0.0
+    _PENDING_FLUSH_BYTES = 64 * 1024
+    _PENDING_FLUSH_SECONDS = 1.0
+
+    @staticmethod
+    def _get_log_handle(abs_path: str):
+        if StageManager._log_fh_path == abs_path:
+            if StageManager._log_fh is not None:
+                return StageManager._log_fh
+            # reopening after a write error: the queued events belong to this file
+        else:
+            StageManager.close_participant_log()
+        # unbuffered: events are already batched in _pending, and a raw write reports
+        # exactly how many bytes reached the file
+        StageManager._log_fh = open(abs_path, "ab", buffering=0)
+        StageManager._log_fh_path = abs_path
+        return StageManager._log_fh
+
+    @staticmethod
+    def flush_participant_log():
+        fh = StageManager._log_fh
+        pending = StageManager._pending
+        StageManager._last_flush = StageManager._now()
+        if fh is None or not pending:
+            return
+        data = memoryview(b"".join(pending))
+        written = 0
+        try:
+            while written < len(data):
+                n = fh.write(data[written:])
+                if not n:
+                    raise OSError("ログファイルに書き込めません")
+                written += n
+        finally:
+            # only what reached the file leaves the queue; the rest (possibly the tail of a
+            # line) is retried on the next flush, so nothing is lost or written twice
+            pending.clear()
+            rest = data[written:]
+            if rest:
+                pending.append(bytes(rest))
+                # _by_stage already counts these events but the file does not have them
+                # yet (and may never): export re-reads the file instead
+                StageManager._by_stage_path = None
+            StageManager._pending_bytes = len(rest)
+
+    @staticmethod
+    def _close_log_handle():
+        """Close the file handle but keep queued events (and their path) for a reopen."""
+        StageManager._log_ready_for_path = ""
+        fh = StageManager._log_fh
+        StageManager._log_fh = None
+        if fh is not None:
+            try:
+                fh.close()
+            except Exception:
+                pass
+
+    @staticmethod
+    def close_participant_log():
+        try:
+            StageManager.flush_participant_log()
+        except Exception:
+            pass
+        if StageManager._pending:
+            # events already folded into _by_stage never reach the file: re-read it on export
+            StageManager._by_stage_path = None
+        StageManager._pending.clear()
+        StageManager._pending_bytes = 0
+        StageManager._close_log_handle()
+        StageManager._log_fh_path = None
+
     @staticmethod
+    @functools.lru_cache(maxsize=16)  # same raw ID on every event
     def _safe_participant_id(pid: str) -> str:
-        pid = (pid or "").strip()
-        if not pid:
-            return ""
-        allowed = []
-        for ch in pid:
-            if ch.isalnum() or ch in ("-", "_"):
-                allowed.append(ch)
-            else:
-                allowed.append("_")
-        return "".join(allowed)
+        # anything but (Unicode) alnum, "-" and "_" becomes "_"
+        return _PID_UNSAFE_RE.sub("_", (pid or "").strip())
 
     @staticmethod
-    def get_stall_seconds(context) -> float:
+    def get_stall_seconds(context, now=None) -> float:
         props = context.scene.tutorial_props
         if props.stage_start_time <= 0.0:
             return 0.0
-        return max(0.0, StageManager._now() - props.stage_start_time)
+        if now is None:
+            now = StageManager._now()
+        return max(0.0, now - props.stage_start_time)
 
     @staticmethod
     def ensure_participant_log_file(context) -> bool:
         props = context.scene.tutorial_props
+        # hot path (every event): one compare, no path resolution or file system calls
+        if props.participant_log_path and props.participant_log_path == StageManager._log_ready_for_path:
+            return True
+
         pid = StageManager._safe_participant_id(props.participant_id)
 
         if not pid:
@@ -146,15 +464,17 @@ class StageManager:
             props.log_dir = StageManager.default_log_dir()
 
         try:
-            dir_abs = StageManager.ensure_dir_exists(props.log_dir)
+            dir_abs = StageManager.get_log_dir_abs(props)
         except Exception as e:
             props.participant_log_error = f"ログ保存フォルダ作成に失敗: {e}"
             return False
 
         if props.participant_log_path:
             try:
-                existing = bpy.path.abspath(props.participant_log_path)
+                existing = _abspath(props.participant_log_path)
                 if os.path.isfile(existing):
+                    StageManager._cached_abs_log_path = (props.participant_log_path, existing)
+                    StageManager._log_ready_for_path = props.participant_log_path
                     props.participant_log_error = ""
                     return True
             except Exception:
@@ -164,21 +484,28 @@ class StageManager:
         log_path = os.path.join(dir_abs, f"{pid}_{ts}.jsonl")
 
         try:
-            with open(log_path, "a", encoding="utf-8") as f:
-                # SAFE: bl_info may not exist depending on load/reload context
-                _addon_info = globals().get("bl_info", {}) or {}
-                f.write(json.dumps({
-                    "t": StageManager._now(),
-                    "participant_id": pid,
-                    "event": "session_start",
-                    "blender_version": ".".join(map(str, bpy.app.version)),
-                    "addon_version": ".".join(map(str, _addon_info.get("version", (0, 0, 0)))),
-                }, ensure_ascii=False) + "\n")
+            # opening the shared handle creates the file (and flushes any previous log)
+            StageManager._get_log_handle(log_path)
+            StageManager._pending.append(_dumps({
+                "t": StageManager._now(),
+                "participant_id": pid,
+                "event": "session_start",
+                "blender_version": _BLENDER_VERSION_STR,
+                "addon_version": _ADDON_VERSION_STR,
+            }) + b"\n")
+            StageManager.flush_participant_log()
 
             props.participant_log_path = log_path
+            StageManager._cached_abs_log_path = (log_path, log_path)
+            StageManager._log_ready_for_path = log_path
+            # new file: the in-memory summary covers it from the start
+            StageManager._by_stage = {}
+            StageManager._by_stage_path = log_path
             props.participant_log_error = ""
             return True
         except Exception as e:
+            # the folder may have been removed outside Blender: resolve/create it again next time
+            StageManager._log_dir_abs = ("", "")
             props.participant_log_error = f"ログファイル作成に失敗: {type(e).__name__}: {e}"
             return False
 
@@ -190,14 +517,40 @@ class StageManager:
         if not StageManager.ensure_participant_log_file(context):
             return
         try:
-            with open(bpy.path.abspath(props.participant_log_path), "a", encoding="utf-8") as f:
-                f.write(json.dumps(event, ensure_ascii=False) + "\n")
+            raw, abs_path = StageManager._cached_abs_log_path
+            if raw != props.participant_log_path:
+                raw = props.participant_log_path
+                abs_path = _abspath(raw)
+                StageManager._cached_abs_log_path = (raw, abs_path)
+            StageManager._get_log_handle(abs_path)
+        except Exception as e:
+            props.participant_log_error = f"ログ書き込みに失敗: {type(e).__name__}: {e}"
+            return
+        try:
+            line = _dumps(event) + b"\n"
+        except Exception as e:
+            # only this event is dropped; queued ones are unaffected
+            props.participant_log_error = f"ログ書き込みに失敗: {type(e).__name__}: {e}"
+            return
+        try:
+            StageManager._pending.append(line)
+            StageManager._pending_bytes += len(line)
+            if StageManager._by_stage_path == abs_path:
+                _fold_stage_event(StageManager._by_stage, event)
+            # written in batches; finalize / idle timer / export flush the rest
+            if (StageManager._pending_bytes >= StageManager._PENDING_FLUSH_BYTES
+                    or StageManager._now() - StageManager._last_flush > StageManager._PENDING_FLUSH_SECONDS):
+                StageManager.flush_participant_log()
         except Exception as e:
+            # keep the queue: it is written once the next event reopens the handle
+            StageManager._close_log_handle()
             props.participant_log_error = f"ログ書き込みに失敗: {type(e).__name__}: {e}"
 
     @staticmethod
     def log_setup_event(context):
         props = context.scene.tutorial_props
+        if not props.enable_participant_logging:
+            return
         pid = StageManager._safe_participant_id(props.participant_id)
         StageManager.append_participant_event(context, {
             "t": StageManager._now(),
@@ -210,9 +563,13 @@ class StageManager:
     @staticmethod
     def log_validate_event(context, ok: bool, reason: str, message: str):
         props = context.scene.tutorial_props
+        if not props.enable_participant_logging:
+            return
         pid = StageManager._safe_participant_id(props.participant_id)
+        # one clock read for both the timestamp and the stall time
+        now = StageManager._now()
         StageManager.append_participant_event(context, {
-            "t": StageManager._now(),
+            "t": now,
             "participant_id": pid,
             "event": "validate",
             "chapter": props.current_chapter,
@@ -221,15 +578,17 @@ class StageManager:
             "reason": reason or "",
             "message": message or "",
             "fail_count": int(props.failed_validate_count),
-            "stall_s": float(StageManager.get_stall_seconds(context)),
+            "stall_s": float(StageManager.get_stall_seconds(context, now)),
         })
 
     @staticmethod
-    def log_finalize_event(context, completed: bool, stalled_seconds: float):
+    def log_finalize_event(context, completed: bool, stalled_seconds: float, now=None):
         props = context.scene.tutorial_props
+        if not props.enable_participant_logging:
+            return
         pid = StageManager._safe_participant_id(props.participant_id)
         StageManager.append_participant_event(context, {
-            "t": StageManager._now(),
+            "t": StageManager._now() if now is None else now,
             "participant_id": pid,
             "event": "finalize",
             "chapter": props.current_chapter,
@@ -245,6 +604,8 @@ class StageManager:
     # -----------------------------
     # Research metrics (in-memory) + finalize
     # -----------------------------
+    MAX_STAGE_RUNS = 500
+
     @staticmethod
     def finalize_current_run(context, completed: bool):
         props = context.scene.tutorial_props
@@ -254,7 +615,14 @@ class StageManager:
         now = StageManager._now()
         stalled = max(0.0, now - props.stage_start_time)
 
-        r = props.stage_runs.add()
+        # Ring buffer: grow up to MAX_STAGE_RUNS, then overwrite the oldest slot in place
+        runs = props.stage_runs
+        if len(runs) < StageManager.MAX_STAGE_RUNS:
+            r = runs.add()
+        else:
+            head = props.stage_runs_head % len(runs)
+            r = runs[head]
+            props.stage_runs_head = (head + 1) % len(runs)
         r.chapter = props.current_chapter
         r.stage = props.current_stage
         r.completed = bool(completed)
@@ -265,49 +633,65 @@ class StageManager:
         r.started_at = float(props.stage_start_time)
         r.ended_at = float(now)
 
-        MAX_RUNS = 500
-        if len(props.stage_runs) > MAX_RUNS:
-            for _ in range(len(props.stage_runs) - MAX_RUNS):
-                props.stage_runs.remove(0)
-
-        StageManager.log_finalize_event(context, completed=completed, stalled_seconds=stalled)
+        # same clock reading as ended_at / stalled_seconds
+        StageManager.log_finalize_event(context, completed=completed, stalled_seconds=stalled, now=now)
+        try:
+            StageManager.flush_participant_log()
+        except Exception as e:
+            props.participant_log_error = f"ログ書き込みに失敗: {type(e).__name__}: {e}"
 
     # -----------------------------
     # Chapter 6: camera + sun + render helper + cleanup
     # -----------------------------
     @staticmethod
     def file_exists_nonempty(path: str) -> bool:
+        # one stat() for both "is a regular file" and "is non-empty"
         try:
-            return os.path.isfile(path) and os.path.getsize(path) > 0
-        except Exception:
+            st = os.stat(path)
+        except (OSError, ValueError):
             return False
+        return stat.S_ISREG(st.st_mode) and st.st_size > 0
 
     @staticmethod
-    def ensure_camera_for_ch6_stage1(location=(10.0, -4.0, 5), rotation_deg=(63.0, 0.0, 66.0)):
+    def ensure_camera_for_ch6_stage1(location=(10.0, -4.0, 5), rotation_deg=None):
         """Create or replace the scene camera for Chapter 6 Stage 1."""
-        for obj in list(bpy.data.objects):
-            if obj.type == 'CAMERA':
-                bpy.data.objects.remove(obj, do_unlink=True)
+        StageManager.remove_objects(StageManager.objects_of_type('CAMERA', bpy.data.cameras))
 
         cam_data = bpy.data.cameras.new(name="Ch6_Camera")
         cam_obj = bpy.data.objects.new(name="Ch6_Camera", object_data=cam_data)
         bpy.context.collection.objects.link(cam_obj)
         cam_obj.location = location
-        cam_obj.rotation_euler = tuple(math.radians(v) for v in rotation_deg)
+        cam_obj.rotation_euler = _ch6_rotation_rad(rotation_deg)
         bpy.context.scene.camera = cam_obj
         return cam_obj
 
+    @staticmethod
+    def objects_of_type(obj_type, datablocks):
+        """Objects of one type; no object scan at all when no datablock of that kind exists."""
+        if not datablocks:
+            return []
+        return [o for o in bpy.data.objects if o.type == obj_type]
+
+    @staticmethod
+    def remove_objects(objs):
+        """Delete objects in one pass (single depsgraph update) when batch_remove exists."""
+        if not objs:
+            return
+        if hasattr(bpy.data, "batch_remove"):
+            bpy.data.batch_remove(objs)
+            return
+        for obj in objs:
+            bpy.data.objects.remove(obj, do_unlink=True)
+
     @staticmethod
     def delete_all_lights():
-        for obj in list(bpy.data.objects):
-            if obj.type == 'LIGHT':
-                bpy.data.objects.remove(obj, do_unlink=True)
+        StageManager.remove_objects(StageManager.objects_of_type('LIGHT', bpy.data.lights))
 
     @staticmethod
     def create_sun_light(
         name="Ch6_Sun",
         location=(10.0, -4.0, 5),
-        rotation_deg=(63.0, 0.0, 66.0),
+        rotation_deg=None,
         energy=10.0,
     ):
         light_data = bpy.data.lights.new(name=name, type='SUN')
@@ -317,7 +701,7 @@ class StageManager:
         bpy.context.collection.objects.link(light_obj)
 
         light_obj.location = location
-        light_obj.rotation_euler = tuple(math.radians(v) for v in rotation_deg)
+        light_obj.rotation_euler = _ch6_rotation_rad(rotation_deg)
         light_obj.hide_viewport = False
         light_obj.hide_render = False
         return light_obj
@@ -325,7 +709,7 @@ class StageManager:
     @staticmethod
     def ensure_sun_for_ch6_stage1(
         location=(10.0, -4.0, 5),
-        rotation_deg=(63.0, 0.0, 66.0),
+        rotation_deg=None,
         energy=10.0,
     ):
         StageManager.delete_all_lights()
@@ -339,12 +723,15 @@ class StageManager:
     @staticmethod
     def turn_off_scene_camera_and_lights():
         """End-of-session cleanup (do not delete)."""
+        try:
+            StageManager.flush_participant_log()
+        except Exception:
+            pass
         scene = bpy.context.scene
         scene.camera = None
-        for obj in bpy.data.objects:
-            if obj.type == 'LIGHT':
-                obj.hide_viewport = True
-                obj.hide_render = True
+        for obj in StageManager.objects_of_type('LIGHT', bpy.data.lights):
+            obj.hide_viewport = True
+            obj.hide_render = True
 
     # -----------------------------
     # Existing helpers for chapters 1-5
@@ -353,15 +740,14 @@ class StageManager:
     def open_shader_editor_at_bottom():
         try:
             context = bpy.context
-            for area in context.screen.areas:
-                if area.type == 'NODE_EDITOR':
-                    return True
-
+            # one pass over the areas: stop at an existing node editor, remember the first 3D view
             view_area = None
             for area in context.screen.areas:
-                if area.type == 'VIEW_3D':
+                area_type = area.type
+                if area_type == 'NODE_EDITOR':
+                    return True
+                if view_area is None and area_type == 'VIEW_3D':
                     view_area = area
-                    break
             if not view_area:
                 return False
 
@@ -385,17 +771,23 @@ class StageManager:
 
     @staticmethod
     def find_cube():
-        for obj in bpy.data.objects:
-            if obj.type == 'MESH' and obj.name == "Cube":
-                return obj
-        return None
+        obj = bpy.data.objects.get("Cube")
+        return obj if obj and obj.type == 'MESH' else None
 
     @staticmethod
     def find_sphere():
-        for obj in bpy.data.objects:
-            if obj.type == 'MESH' and obj.name == "Sphere":
-                return obj
-        return None
+        obj = bpy.data.objects.get("Sphere")
+        return obj if obj and obj.type == 'MESH' else None
+
+    @staticmethod
+    def remove_setup_objects(props):
+        """Remove the previous setup's object and any "Cube"/"Sphere" the checks would pick up.
+
+        Name lookups only, instead of select_all + delete over the whole scene.
+        """
+        names = {props.setup_object_name, "Cube", "Sphere"}
+        StageManager.remove_objects([o for o in map(bpy.data.objects.get, names - {""}) if o is not None])
+        props.setup_object_name = ""
 
     @staticmethod
     def get_view3d_space(context):
@@ -440,6 +832,41 @@ class StageManager:
         bn = StageManager.get_current_brush_name()
         return bool(bn and brush_type_name in bn)
 
+    # Chapter 4 baseline: (props pointer, stored base64, flat float32 xyz array)
+    _initial_vertex_coords = None
+
+    @staticmethod
+    def _snapshot_coords(mesh):
+        """Vertex coordinates as one contiguous float32 xyz array (single foreach_get)."""
+        buf = np.empty(len(mesh.vertices) * 3, dtype=np.float32)
+        mesh.vertices.foreach_get("co", buf)
+        return buf
+
+    @staticmethod
+    def store_initial_vertex_coords(props, mesh):
+        coords = StageManager._snapshot_coords(mesh)
+        # StringProperty cannot hold bytes containing NUL, so the buffer is stored base64-encoded
+        props.initial_vertex_positions_b64 = base64.b64encode(coords.tobytes()).decode("ascii")
+        StageManager._initial_vertex_coords = (
+            props.as_pointer(), props.initial_vertex_positions_b64, coords)
+
+    @staticmethod
+    def get_initial_vertex_coords(props):
+        cached = StageManager._initial_vertex_coords
+        ptr = props.as_pointer()
+        b64 = props.initial_vertex_positions_b64
+        if not b64:
+            return None
+        # decode again only when the scene or the stored baseline changed (reload, undo/redo)
+        if cached is None or cached[0] != ptr or cached[1] != b64:
+            raw = base64.b64decode(b64)
+            cached = (ptr, b64, np.frombuffer(raw, dtype=np.float32))
+            StageManager._initial_vertex_coords = cached
+        return cached[2]
+
+    # scratch buffer for the current Chapter 4 coordinates
+    _deform_buf = None
+
     @staticmethod
     def get_vertex_deformation_amount(sphere, initial_positions):
         """Crash-safe deformation detection."""
@@ -449,22 +876,19 @@ class StageManager:
             if initial_positions is None:
                 return 0, 0.0
 
-            moved = 0
-            total = 0.0
-            compare_count = min(len(sphere.data.vertices), len(initial_positions))
-
-            for i in range(compare_count):
-                try:
-                    v = sphere.data.vertices[i]
-                    init = Vector(initial_positions[i].co)
-                    dist = (v.co - init).length
-                    if dist > 0.001:
-                        moved += 1
-                        total += dist
-                except Exception:
-                    continue
-
-            return moved, total
+            # reuse one scratch buffer across checks; the difference is written into it in place
+            verts = sphere.data.vertices
+            buf = StageManager._deform_buf
+            if buf is None or len(buf) != len(verts) * 3:
+                buf = StageManager._deform_buf = np.empty(len(verts) * 3, dtype=np.float32)
+            verts.foreach_get("co", buf)
+
+            n = min(len(buf), len(initial_positions))
+            diff = np.subtract(buf[:n], initial_positions[:n], out=buf[:n]).reshape(-1, 3)
+            # compare squared distances; sqrt only for the vertices that moved
+            dist2 = np.einsum("ij,ij->i", diff, diff)
+            mask = dist2 > 0.001 * 0.001
+            return int(mask.sum()), float(np.sqrt(dist2[mask]).sum())
         except Exception:
             return 0, 0.0
 
@@ -474,21 +898,42 @@ class StageManager:
             return None
         return obj.active_material
 
+    # {material pointer: (material name, node count, {node.type: [nodes in tree order]})}.
+    # The name guards against a freed pointer being reused by another material;
+    # entries are evicted per material by the depsgraph handler.
+    _node_idx_cache = {}
+    _NODE_IDX_CACHE_MAX = 64
+
+    @staticmethod
+    def _node_index(material):
+        nodes = material.node_tree.nodes
+        key = material.as_pointer()
+        name = material.name_full
+        cache = StageManager._node_idx_cache
+        cached = cache.get(key)
+        if cached is not None and cached[0] == name and cached[1] == len(nodes):
+            return cached[2]
+        index = {}
+        for n in nodes:
+            index.setdefault(n.type, []).append(n)
+        if len(cache) >= StageManager._NODE_IDX_CACHE_MAX:
+            cache.clear()
+        cache[key] = (name, len(nodes), index)
+        return index
+
     @staticmethod
     def get_principled_bsdf(material):
         if not material or not material.use_nodes:
             return None
-        for node in material.node_tree.nodes:
-            if node.type == 'BSDF_PRINCIPLED':
-                return node
-        return None
+        found = StageManager._node_index(material).get('BSDF_PRINCIPLED')
+        return found[0] if found else None
 
     @staticmethod
     def check_image_texture_node_exists(obj):
         mat = StageManager.get_active_material(obj)
         if not mat or not mat.use_nodes:
             return False
-        return any(n.type == 'TEX_IMAGE' and n.image for n in mat.node_tree.nodes)
+        return any(n.image for n in StageManager._node_index(mat).get('TEX_IMAGE', ()))
 
     @staticmethod
     def check_correct_node_link(obj):
@@ -496,15 +941,13 @@ class StageManager:
         if not mat or not mat.use_nodes:
             return False
 
-        tex = None
-        bsdf = None
-        for n in mat.node_tree.nodes:
-            if n.type == 'TEX_IMAGE':
-                tex = n
-            if n.type == 'BSDF_PRINCIPLED':
-                bsdf = n
-        if not tex or not bsdf:
+        index = StageManager._node_index(mat)
+        texs = index.get('TEX_IMAGE')
+        bsdfs = index.get('BSDF_PRINCIPLED')
+        if not texs or not bsdfs:
             return False
+        tex = texs[-1]
+        bsdf = bsdfs[-1]
 
         for link in mat.node_tree.links:
             if link.from_node == tex and link.to_node == bsdf:
@@ -518,300 +961,265 @@ class StageManager:
     @staticmethod
     def get_stage_info(chapter_num, stage_num):
         if chapter_num == 6:
-            return {
-                "title": "第6章: 最終制作",
-                "name": "ステージ1: 自由制作→レンダー保存（のみ）",
-                "description": "自由に作品を作って、Render Result から画像を保存してください",
-                "details": "セットアップ時にカメラとSunライトを自動生成します。\n"
-                           "カメラ位置: X=10m, Y=-4m, Z=4.5m\n"
-                           "カメラ回転: X=63°, Y=0°, Z=66°\n"
-                           "Sun: Energy=1000\n\n"
-                           "F12でレンダー → Render Result で Image > Save As...\n"
-                           "（補助ボタンで自動保存も可能）",
-            }
-
-        if chapter_num == 1:
-            stages = {
-                1: {"title": "第1章: 基本操作", "name": "ステージ1: キューブを選択",
-                    "description": "キューブを選択してください", "details": "1. オブジェクトを右クリックしよう"},
-                2: {"title": "第1章: 基本操作", "name": "ステージ2: キューブを移動",
-                    "description": "X軸方向に+2移動", "details": "2. Gキー → Xキー → 2 → Enter"},
-                3: {"title": "第1章: 基本操作", "name": "ステージ3: キューブを回転",
-                    "description": "X軸周りに45度回転", "details": "3. Rキー → Xキー → 45 → Enter"},
-                4: {"title": "第1章: 基本操作", "name": "ステージ4: スケール変更",
-                    "description": "サイズを変更", "details": "4. Sキーでスケール → Enterで確定"},
-            }
-            return stages.get(stage_num, {})
-        if chapter_num == 2:
-            stages = {
-                1: {"title": "第2章: ビュー操作", "name": "ステージ1: ビューを移動",
-                    "description": "Shift + 中ボタンでパン"},
-                2: {"title": "第2章: ビュー操作", "name": "ステージ2: ズーム",
-                    "description": "中ボタンスクロール"},
-                3: {"title": "第2章: ビュー操作", "name": "ステージ3: ビュー回転",
-                    "description": "中ボタンドラッグ"},
-                4: {"title": "第2章: ビュー操作", "name": "ステージ4: すべてマスター",
-                    "description": "すべての操作を実行"},
-            }
-            return stages.get(stage_num, {})
-        if chapter_num == 3:
-            stages = {
-                1: {"title": "第3章: モデリング基礎", "name": "ステージ1: エディットモード",
-                    "description": "Tab キーで切り替え"},
-                2: {"title": "第3章: モデリング基礎", "name": "ステージ2: 頂点選択",
-                    "description": "3個以上の頂点を選択"},
-                3: {"title": "第3章: モデリング基礎", "name": "ステージ3: エッジ選択",
-                    "description": "エッジを選択"},
-                4: {"title": "第3章: モデリング基礎", "name": "ステージ4: フェース選択",
-                    "description": "フェースを選択"},
-                5: {"title": "第3章: モデリング基礎", "name": "ステージ5: エクストルード",
-                    "description": "E キーで押し出し"},
-                6: {"title": "第3章: モデリング基礎", "name": "ステージ6: ループカット",
-                    "description": "Ctrl+R でループカット"},
-            }
-            return stages.get(stage_num, {})
-        if chapter_num == 4:
-            stages = {
-                1: {"title": "第4章: スカルプティング体験", "name": "ステージ1: スカルプトモード",
-                    "description": "Sculpt Mode に入ってください"},
-                2: {"title": "第4章: スカルプティング体験", "name": "ステージ2: Draw ブラシを使う",
-                    "description": "Draw ブラシで球の表面を変形"},
-                3: {"title": "第4章: スカルプティング体験", "name": "ステージ3: Smooth ブラシに切り替え",
-                    "description": "Smooth ブラシを選択してください"},
-                4: {"title": "第4章: スカルプティング体験", "name": "ステージ4: Grab ブラシに切り替え",
-                    "description": "Grab ブラシを選択してください"},
-            }
-            return stages.get(stage_num, {})
-        if chapter_num == 5:
-            stages = {
-                1: {"title": "第5章: マテリアルノード", "name": "ステージ1: マテリアル作成",
-                    "description": "「新規」ボタンを押す"},
-                2: {"title": "第5章: マテリアルノード", "name": "ステージ2: 色変更",
-                    "description": "Base Color を変更"},
-                3: {"title": "第5章: マテリアルノード", "name": "ステージ3: 画像テクスチャ追加",
-                    "description": "追加 → 画像テクスチャで画像読み込み"},
-                4: {"title": "第5章: マテリアルノード", "name": "ステージ4: ノード接続",
-                    "description": "ImageTexture → BaseColor に接続"},
-                5: {"title": "第5章: マテリアルノード", "name": "ステージ5: 質感調整",
-                    "description": "Roughness または Metallic を変更"},
-            }
-            return stages.get(stage_num, {})
-        return {}
+            stage_num = 1  # Chapter 6 has a single stage
+        return _STAGE_INFO.get((chapter_num, stage_num), {})
 
     @staticmethod
     def apply_hint_escalation(hints, failed_validate_count: int):
         if not hints:
             return []
-        if failed_validate_count <= 1:
-            return hints[:1]
-        if failed_validate_count == 2:
-            return hints[:2]
-        return hints[:3]
+        return hints[:_HINT_ESCALATION[min(max(failed_validate_count, 0), 3)]]
 
     # -----------------------------
     # Validation: Chapters 1-6 (Ch6 Stage1 only)
     # -----------------------------
     @staticmethod
-    def validate_stage(context):
+    def validate_stage(context, chapter=None, stage=None):
+        """Validate (chapter, stage); defaults to the current one in tutorial_props."""
         props = context.scene.tutorial_props
-        ch = props.current_chapter
-        st = props.current_stage
-        obj = context.active_object
-
-        # ---- Chapter 1 ----
-        if ch == 1:
-            if st == 1:
-                if obj and obj.name == "Cube":
-                    return True, "✓ キューブが選択されました", "OK", []
-                return False, "❌ キューブを選択してください", "NO_ACTIVE_CUBE", ["3Dビューで Cube をクリックして選択します"]
-            if st == 2:
-                if not obj or obj.name != "Cube":
-                    return False, "❌ キューブなし", "NO_ACTIVE_CUBE", ["まず Cube を選択してください"]
-                movement = obj.location.x - props.initial_position[0]
-                if abs(movement - 2.0) < 0.1:
-                    return True, "✓ +2移動しました", "OK", []
-                return False, f"❌ 移動: {movement:.2f}", "TRANSFORM_NOT_MATCHED", ["G → X → 2 → Enter の順に入力します"]
-            if st == 3:
-                if not obj or obj.name != "Cube":
-                    return False, "❌ キューブなし", "NO_ACTIVE_CUBE", ["まず Cube を選択してください"]
-                rot = math.degrees(obj.rotation_euler.x) - math.degrees(props.initial_rotation[0])
-                if abs(rot - 45.0) < 1.0:
-                    return True, "✓ 45度回転しました", "OK", []
-                return False, f"❌ 回転: {rot:.1f}°", "TRANSFORM_NOT_MATCHED", ["R → X → 45 → Enter の順に入力します"]
-            if st == 4:
-                if not obj or obj.name != "Cube":
-                    return False, "❌ キューブなし", "NO_ACTIVE_CUBE", ["まず Cube を選択してください"]
-                if abs(obj.scale.x - props.initial_scale[0]) > 0.01:
-                    return True, "✓ スケール変更完了", "OK", []
-                return False, "❌ スケール値を変更してください", "SCALE_NOT_CHANGED", ["S キーでスケール変更できます（Enterで確定）"]
-
-        # ---- Chapter 2 ----
-        if ch == 2:
-            space = StageManager.get_view3d_space(context)
-            if not space or not space.region_3d:
-                return False, "❌ 3Dビューなし", "NO_VIEW3D", ["3Dビューがあるレイアウトに戻してください"]
-            r3d = space.region_3d
-            if st == 1:
-                loc_diff = StageManager.vec_dist(tuple(r3d.view_location), tuple(props.initial_view_location))
-                if loc_diff > 0.1:
-                    return True, "✓ ビュー移動完了", "OK", []
-                return False, "❌ ビューをパンしてください", "VIEW_NOT_MOVED", ["Shift + 中ボタンドラッグでパンします"]
-            if st == 2:
-                if abs(r3d.view_distance - props.initial_view_distance) > 0.5:
-                    return True, "✓ ズーム完了", "OK", []
-                return False, "❌ ズームしてください", "VIEW_NOT_ZOOMED", ["中ボタンスクロールでズームします"]
-            if st == 3:
-                loc_diff = StageManager.vec_dist(tuple(r3d.view_location), tuple(props.initial_view_location))
-                dist_diff = abs(r3d.view_distance - props.initial_view_distance)
-                if loc_diff > 0.01 or dist_diff > 0.01:
-                    return True, "✓ ビュー回転完了", "OK", []
-                return False, "❌ ビューを回転させてください", "VIEW_NOT_ROTATED", ["中ボタンドラッグで回転します（Shiftは押さない）"]
-            if st == 4:
-                loc_diff = StageManager.vec_dist(tuple(r3d.view_location), tuple(props.initial_view_location))
-                dist_diff = abs(r3d.view_distance - props.initial_view_distance)
-                if loc_diff > 0.1 and dist_diff > 0.5:
-                    return True, "✓ すべてのビュー操作をマスターしました", "OK", []
-                return False, "❌ パン + ズームを実行してください", "VIEW_NOT_COMPLETED", ["Shift+中ボタンでパン", "ホイールでズーム"]
-
-        # ---- Chapter 3 ----
-        if ch == 3:
-            if st == 1:
-                if obj and bpy.context.mode == 'EDIT_MESH':
-                    return True, "✓ エディットモード突入", "OK", []
-                return False, "❌ エディットモードに入ってください", "NOT_IN_EDIT_MODE", ["Cubeを選択→TabでEdit Mode"]
-
-            bm = StageManager.get_bm(obj)
-            if not bm:
-                return False, "❌ エディットモード必須", "NOT_IN_EDIT_MODE", ["Cubeを選択→TabでEdit Mode"]
-
-            if st == 2:
-                if not StageManager.get_mesh_select_mode(context)[0]:
-                    return False, "❌ 頂点選択モードに切り替えてください", "WRONG_SELECT_MODE", ["1キーで頂点選択モード"]
-                sel_count = sum(1 for v in bm.verts if v.select)
-                if sel_count >= 3:
-                    return True, f"✓ 頂点選択: {sel_count}個", "OK", []
-                return False, f"❌ 頂点を選択してください ({sel_count}個)", "NOT_ENOUGH_SELECTED", ["Shiftで複数選択", "3つ以上選択"]
-            if st == 3:
-                if not StageManager.get_mesh_select_mode(context)[1]:
-                    return False, "❌ エッジ選択モードに切り替えてください", "WRONG_SELECT_MODE", ["2キーでエッジ選択モード"]
-                if any(e.select for e in bm.edges):
-                    return True, "✓ エッジ選択完了", "OK", []
-                return False, "❌ エッジを選択してください", "NOTHING_SELECTED", ["エッジをクリックして選択"]
-            if st == 4:
-                if not StageManager.get_mesh_select_mode(context)[2]:
-                    return False, "❌ フェース選択モードに切り替えてください", "WRONG_SELECT_MODE", ["3キーでフェース選択モード"]
-                if any(f.select for f in bm.faces):
-                    return True, "✓ フェース選択完了", "OK", []
-                return False, "❌ フェースを選択してください", "NOTHING_SELECTED", ["面をクリックして選択"]
-            if st == 5:
-                if len(bm.faces) > props.initial_face_count:
-                    return True, "✓ 押し出し完了", "OK", []
-                return False, "❌ 面を押し出してください", "EXTRUDE_NOT_DETECTED", ["面を選択→E→Enter"]
-            if st == 6:
-                if len(bm.verts) > props.initial_vertex_count:
-                    return True, "✓ ループカット完了", "OK", []
-                return False, "❌ ループカットを追加してください", "LOOPCUT_NOT_DETECTED", ["Ctrl+R→クリック→クリック"]
-
-        # ---- Chapter 4 ----
-        if ch == 4:
-            sphere = StageManager.find_sphere()
-            if st == 1:
-                if StageManager.is_in_sculpt_mode() and sphere:
-                    return True, "✓ スカルプトモード入場", "OK", []
-                return False, "❌ スカルプトモードに入ってください", "NOT_IN_SCULPT_MODE", ["セットアップ→Sculpt Mode"]
-            if st == 2:
-                if StageManager.is_in_sculpt_mode() and sphere:
-                    moved, _ = StageManager.get_vertex_deformation_amount(sphere, props.initial_vertex_positions)
-                    if moved > 5:
-                        return True, "✓ Draw ブラシで変形しました", "OK", []
-                    return False, "❌ Draw ブラシで変形してください", "SCULPT_NOT_DETECTED", ["Drawでドラッグ", "Fでサイズ調整"]
-                return False, "❌ スカルプトモード必須", "NOT_IN_SCULPT_MODE", ["Sculpt Modeに切り替え"]
-            if st == 3:
-                if StageManager.is_in_sculpt_mode() and StageManager.is_brush_type_selected("Smooth"):
-                    return True, "✓ Smooth ブラシを選択しました", "OK", []
-                return False, "❌ Smooth ブラシを選択してください", "WRONG_BRUSH", ["Smoothを選択"]
-            if st == 4:
-                if StageManager.is_in_sculpt_mode() and StageManager.is_brush_type_selected("Grab"):
-                    return True, "✓ Grab ブラシを選択しました", "OK", []
-                return False, "❌ Grab ブラシを選択してください", "WRONG_BRUSH", ["Grabを選択"]
-
-        # ---- Chapter 5 ----
-        if ch == 5:
-            if st == 1:
-                if not obj:
-                    return False, "❌ オブジェクトを選択してください", "NO_ACTIVE_OBJECT", ["オブジェクトを選択"]
-                mat = StageManager.get_active_material(obj)
-                if mat and mat.use_nodes:
-                    return True, "✓ マテリアル作成完了", "OK", []
-                return False, "❌ マテリアルを作成してください", "NO_MATERIAL", ["Materialで「新規」→Use Nodes"]
-            if st == 2:
-                if not obj:
-                    return False, "❌ オブジェクトを選択してください", "NO_ACTIVE_OBJECT", ["オブジェクトを選択"]
-                mat = StageManager.get_active_material(obj)
-                bsdf = StageManager.get_principled_bsdf(mat) if mat else None
-                if not bsdf:
-                    return False, "❌ Principled BSDF が見つかりません", "NO_BSDF", ["Use NodesをON"]
-                base_color = bsdf.inputs['Base Color'].default_value
-                default = (1.0, 1.0, 1.0, 1.0)
-                changed = any(abs(base_color[i] - default[i]) > 0.01 for i in range(4))
-                if changed:
-                    return True, "✓ Base Color を変更しました", "OK", []
-                return False, "❌ Base Color を変更してください", "BASE_COLOR_NOT_CHANGED", ["Base Colorを変更"]
-            if st == 3:
-                if obj and StageManager.check_image_texture_node_exists(obj):
-                    return True, "✓ 画像テクスチャをロードしました", "OK", []
-                return False, "❌ 画像テクスチャをロードしてください", "NO_IMAGE_TEXTURE", ["画像テクスチャノード→Open"]
-            if st == 4:
-                if obj and StageManager.check_correct_node_link(obj):
-                    return True, "✓ ノード接続完了", "OK", []
-                return False, "❌ ノード接続してください", "NODE_LINK_INCORRECT", ["Image Color→Base Colorへ接続"]
-            if st == 5:
-                if not obj:
-                    return False, "❌ オブジェクトを選択してください", "NO_ACTIVE_OBJECT", ["オブジェクトを選択"]
-                mat = StageManager.get_active_material(obj)
-                bsdf = StageManager.get_principled_bsdf(mat) if mat else None
-                if not bsdf:
-                    return False, "❌ Principled BSDF が見つかりません", "NO_BSDF", ["Use NodesをON"]
-                roughness = bsdf.inputs['Roughness'].default_value
-                metallic = bsdf.inputs['Metallic'].default_value
-                if abs(roughness - 0.5) > 0.01 or abs(metallic - 0.0) > 0.01:
-                    return True, "✓ 質感を変更しました", "OK", []
-                return False, "❌ Roughness または Metallic を変更してください", "PBR_NOT_CHANGED", ["Roughness/Metallicを変更"]
-
-        # ---- Chapter 6 (Stage 1 only) ----
-        if ch == 6:
-            if props.current_stage != 1:
-                props.current_stage = 1
+        ch = props.current_chapter if chapter is None else chapter
+        st = props.current_stage if stage is None else stage
+        # one table lookup instead of an if/elif chain over chapters
+        validator = _VALIDATORS.get(ch, StageManager._validate_not_impl)
+        result = validator(context, props, context.active_object, st)
+        # validators return None for a stage number they do not handle
+        return _VALIDATION_UNKNOWN if result is None else result
+
+    @staticmethod
+    def _validate_not_impl(context, props, obj, st):
+        return _VALIDATION_UNKNOWN
 
-            saved = (props.final_render_saved_path or "").strip()
-            if saved and StageManager.file_exists_nonempty(bpy.path.abspath(saved)):
-                return True, f"✓ 保存OK: {os.path.basename(saved)}", "OK", []
-            return False, "❌ まだ保存が検出できません", "RENDER_NOT_SAVED", [
-                "F12 でレンダー → Render Result で Image > Save As...",
-                "（補助:「補助: レンダーして保存（自動）」でもOK）",
-            ]
+    # ---- Chapter 1 ----
+    @staticmethod
+    def _validate_ch1(context, props, obj, st):
+        if st == 1:
+            if obj and obj.name == "Cube":
+                return True, "✓ キューブが選択されました", "OK", []
+            return False, "❌ キューブを選択してください", "NO_ACTIVE_CUBE", ["3Dビューで Cube をクリックして選択します"]
+        if st == 2:
+            if not obj or obj.name != "Cube":
+                return False, "❌ キューブなし", "NO_ACTIVE_CUBE", ["まず Cube を選択してください"]
+            movement = obj.location.x - props.initial_position[0]
+            if abs(movement - 2.0) < 0.1:
+                return True, "✓ +2移動しました", "OK", []
+            return False, f"❌ 移動: {movement:.2f}", "TRANSFORM_NOT_MATCHED", ["G → X → 2 → Enter の順に入力します"]
+        if st == 3:
+            if not obj or obj.name != "Cube":
+                return False, "❌ キューブなし", "NO_ACTIVE_CUBE", ["まず Cube を選択してください"]
+            rot = math.degrees(obj.rotation_euler.x) - math.degrees(props.initial_rotation[0])
+            if abs(rot - 45.0) < 1.0:
+                return True, "✓ 45度回転しました", "OK", []
+            return False, f"❌ 回転: {rot:.1f}°", "TRANSFORM_NOT_MATCHED", ["R → X → 45 → Enter の順に入力します"]
+        if st == 4:
+            if not obj or obj.name != "Cube":
+                return False, "❌ キューブなし", "NO_ACTIVE_CUBE", ["まず Cube を選択してください"]
+            if abs(obj.scale.x - props.initial_scale[0]) > 0.01:
+                return True, "✓ スケール変更完了", "OK", []
+            return False, "❌ スケール値を変更してください", "SCALE_NOT_CHANGED", ["S キーでスケール変更できます（Enterで確定）"]
+
+    # ---- Chapter 2 ----
+    @staticmethod
+    def _validate_ch2(context, props, obj, st):
+        space = StageManager.get_view3d_space(context)
+        if not space or not space.region_3d:
+            return False, "❌ 3Dビューなし", "NO_VIEW3D", ["3Dビューがあるレイアウトに戻してください"]
+        r3d = space.region_3d
+        if st == 1:
+            loc_diff = StageManager.vec_dist(r3d.view_location, props.initial_view_location)
+            if loc_diff > 0.1:
+                return True, "✓ ビュー移動完了", "OK", []
+            return False, "❌ ビューをパンしてください", "VIEW_NOT_MOVED", ["Shift + 中ボタンドラッグでパンします"]
+        if st == 2:
+            if abs(r3d.view_distance - props.initial_view_distance) > 0.5:
+                return True, "✓ ズーム完了", "OK", []
+            return False, "❌ ズームしてください", "VIEW_NOT_ZOOMED", ["中ボタンスクロールでズームします"]
+        if st == 3:
+            loc_diff = StageManager.vec_dist(r3d.view_location, props.initial_view_location)
+            dist_diff = abs(r3d.view_distance - props.initial_view_distance)
+            if loc_diff > 0.01 or dist_diff > 0.01:
+                return True, "✓ ビュー回転完了", "OK", []
+            return False, "❌ ビューを回転させてください", "VIEW_NOT_ROTATED", ["中ボタンドラッグで回転します（Shiftは押さない）"]
+        if st == 4:
+            loc_diff = StageManager.vec_dist(r3d.view_location, props.initial_view_location)
+            dist_diff = abs(r3d.view_distance - props.initial_view_distance)
+            if loc_diff > 0.1 and dist_diff > 0.5:
+                return True, "✓ すべてのビュー操作をマスターしました", "OK", []
+            return False, "❌ パン + ズームを実行してください", "VIEW_NOT_COMPLETED", ["Shift+中ボタンでパン", "ホイールでズーム"]
+
+    # ---- Chapter 3 ----
+    @staticmethod
+    def _validate_ch3(context, props, obj, st):
+        if st == 1:
+            if obj and bpy.context.mode == 'EDIT_MESH':
+                return True, "✓ エディットモード突入", "OK", []
+            return False, "❌ エディットモードに入ってください", "NOT_IN_EDIT_MODE", ["Cubeを選択→TabでEdit Mode"]
+
+        if not obj or obj.type != 'MESH' or bpy.context.mode != 'EDIT_MESH':
+            return False, "❌ エディットモード必須", "NOT_IN_EDIT_MODE", ["Cubeを選択→TabでEdit Mode"]
+
+        # Selection counts: Mesh.total_*_sel are edit-mesh counters kept by Blender (no element scan)
+        mesh = obj.data
+        if st == 2:
+            if not StageManager.get_mesh_select_mode(context)[0]:
+                return False, "❌ 頂点選択モードに切り替えてください", "WRONG_SELECT_MODE", ["1キーで頂点選択モード"]
+            sel_count = mesh.total_vert_sel
+            if sel_count >= 3:
+                return True, f"✓ 頂点選択: {sel_count}個", "OK", []
+            return False, f"❌ 頂点を選択してください ({sel_count}個)", "NOT_ENOUGH_SELECTED", ["Shiftで複数選択", "3つ以上選択"]
+        if st == 3:
+            if not StageManager.get_mesh_select_mode(context)[1]:
+                return False, "❌ エッジ選択モードに切り替えてください", "WRONG_SELECT_MODE", ["2キーでエッジ選択モード"]
+            if mesh.total_edge_sel > 0:
+                return True, "✓ エッジ選択完了", "OK", []
+            return False, "❌ エッジを選択してください", "NOTHING_SELECTED", ["エッジをクリックして選択"]
+        if st == 4:
+            if not StageManager.get_mesh_select_mode(context)[2]:
+                return False, "❌ フェース選択モードに切り替えてください", "WRONG_SELECT_MODE", ["3キーでフェース選択モード"]
+            if mesh.total_face_sel > 0:
+                return True, "✓ フェース選択完了", "OK", []
+            return False, "❌ フェースを選択してください", "NOTHING_SELECTED", ["面をクリックして選択"]
+        bm = StageManager.get_bm(obj)
+        if not bm:
+            return False, "❌ エディットモード必須", "NOT_IN_EDIT_MODE", ["Cubeを選択→TabでEdit Mode"]
+        if st == 5:
+            if len(bm.faces) > props.initial_face_count:
+                return True, "✓ 押し出し完了", "OK", []
+            return False, "❌ 面を押し出してください", "EXTRUDE_NOT_DETECTED", ["面を選択→E→Enter"]
+        if st == 6:
+            if len(bm.verts) > props.initial_vertex_count:
+                return True, "✓ ループカット完了", "OK", []
+            return False, "❌ ループカットを追加してください", "LOOPCUT_NOT_DETECTED", ["Ctrl+R→クリック→クリック"]
+
+    # ---- Chapter 4 ----
+    @staticmethod
+    def _validate_ch4(context, props, obj, st):
+        sphere = StageManager.find_sphere()
+        if st == 1:
+            if StageManager.is_in_sculpt_mode() and sphere:
+                return True, "✓ スカルプトモード入場", "OK", []
+            return False, "❌ スカルプトモードに入ってください", "NOT_IN_SCULPT_MODE", ["セットアップ→Sculpt Mode"]
+        if st == 2:
+            if StageManager.is_in_sculpt_mode() and sphere:
+                initial = StageManager.get_initial_vertex_coords(props)
+                if initial is None:
+                    # e.g. a .blend saved before the baseline moved to initial_vertex_positions_b64
+                    return False, "❌ 変形前の形状が記録されていません", "BASELINE_MISSING", ["セットアップを押してやり直す"]
+                moved, _ = StageManager.get_vertex_deformation_amount(sphere, initial)
+                if moved > 5:
+                    return True, "✓ Draw ブラシで変形しました", "OK", []
+                return False, "❌ Draw ブラシで変形してください", "SCULPT_NOT_DETECTED", ["Drawでドラッグ", "Fでサイズ調整"]
+            return False, "❌ スカルプトモード必須", "NOT_IN_SCULPT_MODE", ["Sculpt Modeに切り替え"]
+        if st == 3:
+            if StageManager.is_in_sculpt_mode() and StageManager.is_brush_type_selected("Smooth"):
+                return True, "✓ Smooth ブラシを選択しました", "OK", []
+            return False, "❌ Smooth ブラシを選択してください", "WRONG_BRUSH", ["Smoothを選択"]
+        if st == 4:
+            if StageManager.is_in_sculpt_mode() and StageManager.is_brush_type_selected("Grab"):
+                return True, "✓ Grab ブラシを選択しました", "OK", []
+            return False, "❌ Grab ブラシを選択してください", "WRONG_BRUSH", ["Grabを選択"]
+
+    # ---- Chapter 5 ----
+    @staticmethod
+    def _validate_ch5(context, props, obj, st):
+        if st == 1:
+            if not obj:
+                return False, "❌ オブジェクトを選択してください", "NO_ACTIVE_OBJECT", ["オブジェクトを選択"]
+            mat = StageManager.get_active_material(obj)
+            if mat and mat.use_nodes:
+                return True, "✓ マテリアル作成完了", "OK", []
+            return False, "❌ マテリアルを作成してください", "NO_MATERIAL", ["Materialで「新規」→Use Nodes"]
+        if st == 2:
+            if not obj:
+                return False, "❌ オブジェクトを選択してください", "NO_ACTIVE_OBJECT", ["オブジェクトを選択"]
+            mat = StageManager.get_active_material(obj)
+            bsdf = StageManager.get_principled_bsdf(mat) if mat else None
+            if not bsdf:
+                return False, "❌ Principled BSDF が見つかりません", "NO_BSDF", ["Use NodesをON"]
+            base_color = bsdf.inputs['Base Color'].default_value
+            default = (1.0, 1.0, 1.0, 1.0)
+            changed = any(abs(base_color[i] - default[i]) > 0.01 for i in range(4))
+            if changed:
+                return True, "✓ Base Color を変更しました", "OK", []
+            return False, "❌ Base Color を変更してください", "BASE_COLOR_NOT_CHANGED", ["Base Colorを変更"]
+        if st == 3:
+            if obj and StageManager.check_image_texture_node_exists(obj):
+                return True, "✓ 画像テクスチャをロードしました", "OK", []
+            return False, "❌ 画像テクスチャをロードしてください", "NO_IMAGE_TEXTURE", ["画像テクスチャノード→Open"]
+        if st == 4:
+            if obj and StageManager.check_correct_node_link(obj):
+                return True, "✓ ノード接続完了", "OK", []
+            return False, "❌ ノード接続してください", "NODE_LINK_INCORRECT", ["Image Color→Base Colorへ接続"]
+        if st == 5:
+            if not obj:
+                return False, "❌ オブジェクトを選択してください", "NO_ACTIVE_OBJECT", ["オブジェクトを選択"]
+            mat = StageManager.get_active_material(obj)
+            bsdf = StageManager.get_principled_bsdf(mat) if mat else None
+            if not bsdf:
+                return False, "❌ Principled BSDF が見つかりません", "NO_BSDF", ["Use NodesをON"]
+            roughness = bsdf.inputs['Roughness'].default_value
+            metallic = bsdf.inputs['Metallic'].default_value
+            if abs(roughness - 0.5) > 0.01 or abs(metallic - 0.0) > 0.01:
+                return True, "✓ 質感を変更しました", "OK", []
+            return False, "❌ Roughness または Metallic を変更してください", "PBR_NOT_CHANGED", ["Roughness/Metallicを変更"]
+
+    # ---- Chapter 6 (Stage 1 only) ----
+    @staticmethod
+    def _validate_ch6(context, props, obj, st):
+        if st != 1 and props.current_chapter == 6:
+            props.current_stage = 1
 
-        return False, "❌ 判定エラー", "UNKNOWN", ["セットアップして再試行"]
+        saved = (props.final_render_saved_path or "").strip()
+        if saved and StageManager.file_exists_nonempty(_abspath(saved)):
+            return True, f"✓ 保存OK: {os.path.basename(saved)}", "OK", ()
+        return _CH6_NOT_SAVED
 
     @staticmethod
     def check_stage(context):
         try:
-            ok, _message, _reason, _hints = StageManager.validate_stage(context)
             props = context.scene.tutorial_props
-            if ok and not props.stage_complete:
+            if props.stage_complete:
+                # already cleared; nothing left to detect until the next stage
+                return
+            ok, _message, _reason, _hints = StageManager.validate_stage(context)
+            if ok:
                 props.stage_complete = True
         except Exception:
             return
 
+# Chapter -> validator. Each returns (ok, message, reason, hints),
+# or None when the stage number is not handled
+_VALIDATORS = {
+    1: StageManager._validate_ch1,
+    2: StageManager._validate_ch2,
+    3: StageManager._validate_ch3,
+    4: StageManager._validate_ch4,
+    5: StageManager._validate_ch5,
+    6: StageManager._validate_ch6,
+}
+
 # =====================================================
 # PROPERTIES
 # =====================================================
 
+def _on_log_settings_update(self, context):
+    # participant ID / log folder edited: re-check the log file on the next event
+    StageManager._log_ready_for_path = ""
+
+def _on_log_dir_update(self, context):
+    # the new folder is resolved and created on next use (get_log_dir_abs)
+    StageManager._log_dir_abs = ("", "")
+    _on_log_settings_update(self, context)
+
 class TUTORIAL_PG_Properties(PropertyGroup):
     current_chapter: IntProperty(default=1, min=1, max=6)
     current_stage: IntProperty(default=1, min=1, max=10)
     stage_complete: BoolProperty(default=False)
     monitoring_active: BoolProperty(default=False)
+    # set by setup/validate so the monitoring timer returns to its fast rate
+    monitoring_reset: BoolProperty(default=False)
+
+    # Object created by the last setup (removed on the next setup)
+    setup_object_name: StringProperty(default="")
 
     # Chapter 1 initial transforms
     initial_position: FloatVectorProperty(default=(0.0, 0.0, 0.0), size=3)
@@ -828,7 +1236,7 @@ class TUTORIAL_PG_Properties(PropertyGroup):
     initial_face_count: IntProperty(default=0)
 
     # Chapter 4
-    initial_vertex_positions: CollectionProperty(type=VertexPos)
+    initial_vertex_positions_b64: StringProperty(default="")  # float32 xyz, base64
 
     # Feedback
     failed_validate_count: IntProperty(default=0, min=0)
@@ -840,16 +1248,20 @@ class TUTORIAL_PG_Properties(PropertyGroup):
 
     # Research summary
     stage_runs: CollectionProperty(type=StageRun)
+    # stage_runs is a ring buffer of MAX_STAGE_RUNS slots: once full, the oldest run is
+    # at stage_runs_head and the collection is no longer in chronological order
+    stage_runs_head: IntProperty(default=0, min=0)
     current_stall_seconds: FloatProperty(default=0.0, min=0.0)
 
     # Logging
     enable_participant_logging: BoolProperty(default=True)
-    participant_id: StringProperty(name="参加者ID", default="")
+    participant_id: StringProperty(name="参加者ID", default="", update=_on_log_settings_update)
     log_dir: StringProperty(
         name="ログ保存フォルダ",
         description="クリックでフォルダ選択（環境によってFile Browserが落ちる場合あり：下の安全ボタンを使用）",
         subtype='DIR_PATH',
         default=StageManager.default_log_dir(),
+        update=_on_log_dir_update,
     )
     participant_log_path: StringProperty(default="")
     participant_log_error: StringProperty(default="")
@@ -869,12 +1281,13 @@ class TUTORIAL_OT_set_default_log_dir(Operator):
     def execute(self, context):
         props = context.scene.tutorial_props
         props.log_dir = StageManager.default_log_dir()
+        _abspath.cache_clear()
         try:
-            StageManager.ensure_dir_exists(props.log_dir)
+            abs_dir = StageManager.get_log_dir_abs(props)
         except Exception as e:
             self.report({'ERROR'}, f"フォルダ作成に失敗: {e}")
             return {'CANCELLED'}
-        self.report({'INFO'}, f"設定: {bpy.path.abspath(props.log_dir)}")
+        self.report({'INFO'}, f"設定: {abs_dir}")
         return {'FINISHED'}
 
 class TUTORIAL_OT_open_log_folder(Operator):
@@ -897,25 +1310,17 @@ class TUTORIAL_OT_confirm_all_chapters(Operator):
     bl_description = "第1章〜第6章のステージ1を順番に判定し、OK/NGを一覧表示します（状態は元に戻します）"
 
     def execute(self, context):
-        props = context.scene.tutorial_props
-        original_ch = props.current_chapter
-        original_st = props.current_stage
-
+        # explicit (chapter, stage): no writes to tutorial_props, so nothing to restore
         results = []
-        try:
-            for ch in range(1, 7):
-                props.current_chapter = ch
-                props.current_stage = 1
-                ok, message, reason, _hints = StageManager.validate_stage(context)
-                results.append((ch, ok, reason, message))
-        finally:
-            props.current_chapter = original_ch
-            props.current_stage = original_st
+        for ch in range(1, 7):
+            ok, message, reason, _hints = StageManager.validate_stage(context, chapter=ch, stage=1)
+            results.append((ch, ok, reason, message))
 
-        print("[Confirm All Chapters]")
+        lines = ["[Confirm All Chapters]"]
         for ch, ok, reason, message in results:
             status = "OK" if ok else "NG"
-            print(f"  Ch{ch}: {status} ({reason}) {message}")
+            lines.append(f"  Ch{ch}: {status} ({reason}) {message}")
+        print("\n".join(lines))
 
         summary = " / ".join([f"Ch{ch}:{'OK' if ok else 'NG'}" for ch, ok, _, _ in results])
         self.report({'INFO'}, summary)
@@ -936,71 +1341,93 @@ class TUTORIAL_OT_export_stage_summary_csv(Operator):
                 self.report({'ERROR'}, props.participant_log_error or "ログファイルを作成できません。参加者IDとログ保存フォルダを確認してください。")
                 return {'CANCELLED'}
 
-        jsonl_path = bpy.path.abspath(props.participant_log_path)
-        if not os.path.isfile(jsonl_path):
-            self.report({'ERROR'}, f"ログファイルが見つかりません: {jsonl_path}")
+        try:
+            StageManager.flush_participant_log()
+        except Exception as e:
+            self.report({'ERROR'}, f"ログ書き込みに失敗: {e}")
             return {'CANCELLED'}
 
-        events = []
+        jsonl_path = _abspath(props.participant_log_path)
+        if StageManager._by_stage_path == jsonl_path:
+            # every event of this log went through append_participant_event in this session
+            by_stage = StageManager._by_stage
+            total_stalled = _total_stalled(by_stage)
+        else:
+            # log started by an earlier session: parse it once, then keep it up to date in memory
+            # open() reports a missing file itself; no separate stat beforehand
+            try:
+                by_stage, total_stalled = _aggregate_jsonl(jsonl_path)
+            except FileNotFoundError:
+                self.report({'ERROR'}, f"ログファイルが見つかりません: {jsonl_path}")
+                return {'CANCELLED'}
+            except Exception as e:
+                self.report({'ERROR'}, f"ログ読み込みに失敗: {e}")
+                return {'CANCELLED'}
+            StageManager._by_stage = by_stage
+            StageManager._by_stage_path = jsonl_path
+
+        log_path = Path(jsonl_path)
+        out_csv = str(log_path.with_suffix(".stage_summary.csv"))
         try:
-            with open(jsonl_path, "r", encoding="utf-8") as f:
-                for line in f:
-                    line = line.strip()
-                    if not line:
-                        continue
-                    try:
-                        events.append(json.loads(line))
-                    except json.JSONDecodeError:
-                        continue
+            # Excel-friendly UTF-8 with BOM; 1 MiB buffer so writerows() reaches disk in few writes
+            with open(out_csv, "w", encoding="utf-8-sig", newline="", buffering=1 << 20) as f:
+                rows = [
+                    ["participant_log_file", log_path.name],
+                    ["total_stalled_seconds_finalize_only", f"{total_stalled:.3f}"],
+                    [],
+                    ["chapter", "stage", "failures", "stalled_seconds_finalize_only", "completed"],
+                ]
+                rows.extend(_stage_summary_rows(by_stage))
+                csv.writer(f).writerows(rows)
+        except Exception as e:
+            self.report({'ERROR'}, f"CSV出力に失敗: {e}")
+            return {'CANCELLED'}
+
+        self.report({'INFO'}, f"CSV出力完了: {out_csv}")
+        return {'FINISHED'}
+
+class TUTORIAL_OT_export_all_summaries_csv(Operator):
+    bl_idname = "tutorial.export_all_summaries_csv"
+    bl_label = "全参加者の集計CSV出力"
+    bl_description = "ログ保存フォルダ内の全参加者ログ(JSONL)を集計し、1つのCSVにまとめて出力します"
+
+    def execute(self, context):
+        props = context.scene.tutorial_props
+
+        try:
+            StageManager.flush_participant_log()
+            base_dir = StageManager.get_log_dir_abs(props)
+        except Exception as e:
+            self.report({'ERROR'}, f"ログフォルダを準備できません: {e}")
+            return {'CANCELLED'}
+
+        paths = sorted(Path(base_dir).glob("*.jsonl"))
+        if not paths:
+            self.report({'ERROR'}, f"ログファイルが見つかりません: {base_dir}")
+            return {'CANCELLED'}
+
+        # One file after another: the parse is CPU-bound and holds the GIL, so threads would
+        # not help, and worker processes cannot import this module (it imports bpy)
+        try:
+            results = [_aggregate_jsonl(p) for p in paths]
         except Exception as e:
             self.report({'ERROR'}, f"ログ読み込みに失敗: {e}")
             return {'CANCELLED'}
 
-        by_stage = {}
-        for ev in events:
-            ev_type = ev.get("event")
-            if ev_type not in ("validate", "finalize"):
-                continue
-            ch = ev.get("chapter")
-            st = ev.get("stage")
-            if ch is None or st is None:
-                continue
-            key = (int(ch), int(st))
-            if key not in by_stage:
-                by_stage[key] = {"chapter": int(ch), "stage": int(st), "failures": 0, "stalled_seconds": None, "completed": None}
-            if ev_type == "validate" and ev.get("ok") is False:
-                by_stage[key]["failures"] += 1
-            if ev_type == "finalize":
-                if ev.get("stalled_seconds") is not None:
-                    by_stage[key]["stalled_seconds"] = float(ev["stalled_seconds"])
-                if ev.get("completed") is not None:
-                    by_stage[key]["completed"] = bool(ev["completed"])
-
-        total_stalled = 0.0
-        for r in by_stage.values():
-            if isinstance(r["stalled_seconds"], (int, float)):
-                total_stalled += float(r["stalled_seconds"])
-
-        out_csv = os.path.splitext(jsonl_path)[0] + ".stage_summary.csv"
+        rows = [["participant_log_file", "chapter", "stage", "failures", "stalled_seconds_finalize_only", "completed"]]
+        for p, (by_stage, _total) in zip(paths, results):
+            rows.extend([p.name] + row for row in _stage_summary_rows(by_stage))
+
+        out_csv = os.path.join(base_dir, "all_participants.stage_summary.csv")
         try:
-            # Excel-friendly UTF-8 with BOM
-            with open(out_csv, "w", encoding="utf-8-sig", newline="") as f:
-                w = csv.writer(f)
-                w.writerow(["participant_log_file", os.path.basename(jsonl_path)])
-                w.writerow(["total_stalled_seconds_finalize_only", f"{total_stalled:.3f}"])
-                w.writerow([])
-                w.writerow(["chapter", "stage", "failures", "stalled_seconds_finalize_only", "completed"])
-                for key in sorted(by_stage.keys()):
-                    r = by_stage[key]
-                    stalled = r["stalled_seconds"]
-                    stalled_str = f"{stalled:.3f}" if isinstance(stalled, (int, float)) else ""
-                    completed_str = "" if r["completed"] is None else str(r["completed"])
-                    w.writerow([r["chapter"], r["stage"], r["failures"], stalled_str, completed_str])
+            # Excel-friendly UTF-8 with BOM; 1 MiB buffer so writerows() reaches disk in few writes
+            with open(out_csv, "w", encoding="utf-8-sig", newline="", buffering=1 << 20) as f:
+                csv.writer(f).writerows(rows)
         except Exception as e:
             self.report({'ERROR'}, f"CSV出力に失敗: {e}")
             return {'CANCELLED'}
 
-        self.report({'INFO'}, f"CSV出力完了: {out_csv}")
+        self.report({'INFO'}, f"CSV出力完了: {out_csv}（{len(paths)}件）")
         return {'FINISHED'}
 
 class TUTORIAL_OT_render_and_mark_saved(Operator):
@@ -1011,7 +1438,7 @@ class TUTORIAL_OT_render_and_mark_saved(Operator):
     def execute(self, context):
         props = context.scene.tutorial_props
         try:
-            base_dir = StageManager.ensure_dir_exists(props.log_dir or StageManager.default_log_dir())
+            base_dir = StageManager.get_log_dir_abs(props)
         except Exception as e:
             self.report({'ERROR'}, f"ログ保存フォルダ作成に失敗: {e}")
             return {'CANCELLED'}
@@ -1038,6 +1465,8 @@ class TUTORIAL_OT_render_and_mark_saved(Operator):
 
             img.save_render(filepath=out_path, scene=context.scene)
             props.final_render_saved_path = out_path
+            # the Chapter 6 check is event-driven: run it here instead of polling the file
+            StageManager.check_stage(context)
             self.report({'INFO'}, f"保存しました: {out_path}")
             return {'FINISHED'}
         except Exception as e:
@@ -1067,12 +1496,12 @@ class TUTORIAL_OT_setup_stage(Operator):
         try:
             if ch == 1:
                 bpy.ops.object.mode_set(mode='OBJECT')
-                bpy.ops.object.select_all(action='SELECT')
-                bpy.ops.object.delete(use_global=False)
+                StageManager.remove_setup_objects(props)
 
                 bpy.ops.mesh.primitive_cube_add(size=2, location=(0, 0, 0))
                 cube = bpy.context.active_object
                 cube.name = "Cube"
+                props.setup_object_name = cube.name
                 props.initial_position = tuple(cube.location)
                 props.initial_rotation = tuple(cube.rotation_euler)
                 props.initial_scale = tuple(cube.scale)
@@ -1087,11 +1516,11 @@ class TUTORIAL_OT_setup_stage(Operator):
                 cube = StageManager.find_cube()
                 if not cube:
                     bpy.ops.object.mode_set(mode='OBJECT')
-                    bpy.ops.object.select_all(action='SELECT')
-                    bpy.ops.object.delete(use_global=False)
+                    StageManager.remove_setup_objects(props)
                     bpy.ops.mesh.primitive_cube_add(size=2, location=(0, 0, 0))
                     cube = bpy.context.active_object
                     cube.name = "Cube"
+                    props.setup_object_name = cube.name
 
                 bpy.context.view_layer.objects.active = cube
                 cube.select_set(True)
@@ -1104,20 +1533,17 @@ class TUTORIAL_OT_setup_stage(Operator):
 
             elif ch == 4:
                 bpy.ops.object.mode_set(mode='OBJECT')
-                bpy.ops.object.select_all(action='SELECT')
-                bpy.ops.object.delete(use_global=False)
+                StageManager.remove_setup_objects(props)
 
                 bpy.ops.mesh.primitive_uv_sphere_add(radius=1, location=(0, 0, 0))
                 sphere = bpy.context.active_object
                 sphere.name = "Sphere"
+                props.setup_object_name = sphere.name
                 bpy.context.view_layer.objects.active = sphere
                 sphere.select_set(True)
                 bpy.ops.object.mode_set(mode='SCULPT')
 
-                props.initial_vertex_positions.clear()
-                for v in sphere.data.vertices:
-                    item = props.initial_vertex_positions.add()
-                    item.co = v.co.copy()
+                StageManager.store_initial_vertex_coords(props, sphere.data)
 
             elif ch == 5:
                 bpy.ops.object.mode_set(mode='OBJECT')
@@ -1125,6 +1551,7 @@ class TUTORIAL_OT_setup_stage(Operator):
                     bpy.ops.mesh.primitive_cube_add(size=2, location=(0, 0, 0))
                     cube = bpy.context.active_object
                     cube.name = "Cube"
+                    props.setup_object_name = cube.name
                 StageManager.open_shader_editor_at_bottom()
 
             elif ch == 6:
@@ -1132,11 +1559,9 @@ class TUTORIAL_OT_setup_stage(Operator):
                 props.final_render_saved_path = ""
                 StageManager.ensure_camera_for_ch6_stage1(
                     location=(10.0, -4.0, 5),
-                    rotation_deg=(63.0, 0.0, 66.0),
                 )
                 StageManager.ensure_sun_for_ch6_stage1(
                     location=(10.0, -4.0, 5),
-                    rotation_deg=(63.0, 0.0, 66.0),
                     energy=10.0,
                 )
 
@@ -1146,6 +1571,7 @@ class TUTORIAL_OT_setup_stage(Operator):
 
         props.stage_complete = False
         props.monitoring_active = True
+        props.monitoring_reset = True
 
         props.failed_validate_count = 0
         props.stage_start_time = time.time()
@@ -1157,7 +1583,7 @@ class TUTORIAL_OT_setup_stage(Operator):
         if not (props.log_dir or "").strip():
             props.log_dir = StageManager.default_log_dir()
         try:
-            StageManager.ensure_dir_exists(props.log_dir)
+            StageManager.get_log_dir_abs(props)
         except Exception as e:
             props.participant_log_error = f"ログ保存フォルダ作成に失敗: {e}"
 
@@ -1173,6 +1599,7 @@ class TUTORIAL_OT_validate_stage(Operator):
         props = context.scene.tutorial_props
         ok, message, reason, hints = StageManager.validate_stage(context)
 
+        props.monitoring_reset = True
         props.last_result_ok = ok
         props.last_reason = reason
         props.last_message = message
@@ -1198,8 +1625,7 @@ class TUTORIAL_OT_next_stage(Operator):
         props = context.scene.tutorial_props
         StageManager.finalize_current_run(context, completed=True)
 
-        max_stages_per_chapter = {1: 4, 2: 4, 3: 6, 4: 4, 5: 5, 6: 1}
-        max_stages = max_stages_per_chapter.get(props.current_chapter, 1)
+        max_stages = _MAX_STAGES[props.current_chapter]
 
         if props.current_stage < max_stages:
             props.current_stage += 1
@@ -1272,22 +1698,51 @@ class TUTORIAL_OT_monitoring(Operator):
     bl_label = "Tutorial Monitoring"
     _timer = None
     _last_check = 0.0
+    # True while a modal instance is running (runtime only, not saved in the .blend)
+    _running = False
+
+    # Timer rate: fast while the participant is acting, slower after a quiet period
+    _INTERVAL = 0.1
+    _IDLE_INTERVAL = 0.5
+    _IDLE_AFTER_SECONDS = 5.0
+    _interval = _INTERVAL
+    _last_activity = 0.0
+
+    def _set_interval(self, context, interval):
+        wm = context.window_manager
+        if self._timer:
+            wm.event_timer_remove(self._timer)
+        self._timer = wm.event_timer_add(interval, window=context.window)
+        self._interval = interval
 
     def modal(self, context, event):
         if event.type == 'TIMER':
             try:
                 props = context.scene.tutorial_props
                 if not props.monitoring_active:
-                    wm = context.window_manager
-                    if self._timer:
-                        wm.event_timer_remove(self._timer)
+                    self.cancel(context)
                     return {'FINISHED'}
 
                 # OK to write here (not in draw)
                 props.current_stall_seconds = StageManager.get_stall_seconds(context)
 
                 current_time = time.time()
-                if current_time - self._last_check > 0.2:
+                if props.monitoring_reset:
+                    props.monitoring_reset = False
+                    self._last_activity = current_time
+                # Chapter 6 is not polled (see below), so the timer only refreshes the
+                # stall display there and the slow rate is enough
+                idle = props.current_chapter == 6 or (
+                    props.current_stall_seconds > self._IDLE_AFTER_SECONDS
+                    and current_time - self._last_activity > self._IDLE_AFTER_SECONDS)
+                interval = self._IDLE_INTERVAL if idle else self._INTERVAL
+                if interval != self._interval:
+                    self._set_interval(context, interval)
+
+                # Chapter 6 only changes via render_and_mark_saved, which checks the stage
+                # itself, so polling it would just stat() the saved file 5x per second
+                if (not props.stage_complete and props.current_chapter != 6
+                        and current_time - self._last_check > 0.2):
                     StageManager.check_stage(context)
                     self._last_check = current_time
             except Exception:
@@ -1296,11 +1751,19 @@ class TUTORIAL_OT_monitoring(Operator):
 
     def execute(self, context):
         wm = context.window_manager
-        self._timer = wm.event_timer_add(0.1, window=context.window)
-        self._last_check = time.time()
+        self._timer = None
+        self._set_interval(context, self._INTERVAL)
+        self._last_check = self._last_activity = time.time()
         wm.modal_handler_add(self)
+        TUTORIAL_OT_monitoring._running = True
         return {'RUNNING_MODAL'}
 
+    def cancel(self, context):
+        if self._timer:
+            context.window_manager.event_timer_remove(self._timer)
+            self._timer = None
+        TUTORIAL_OT_monitoring._running = False
+
 # =====================================================
 # PANEL
 # =====================================================
@@ -1327,6 +1790,7 @@ class TUTORIAL_PT_main(Panel):
 
         pbox.prop(props, "enable_participant_logging", text="ログ記録を有効化")
         pbox.operator("tutorial.export_stage_summary_csv", text="ステージ集計CSV出力")
+        pbox.operator("tutorial.export_all_summaries_csv", text="全参加者の集計CSV出力")
 
         if props.participant_log_path:
             pbox.label(text=f"ログファイル: {props.participant_log_path}")
@@ -1336,16 +1800,15 @@ class TUTORIAL_PT_main(Panel):
         cbox = layout.box()
         cbox.label(text="チャプター選択")
         row = cbox.row(align=True)
-        for i in range(1, 7):
-            op = row.operator("tutorial.goto_chapter", text=f"第{i}章", depress=(props.current_chapter == i))
+        for i, label in enumerate(_CH_LABELS, 1):
+            op = row.operator("tutorial.goto_chapter", text=label, depress=(props.current_chapter == i))
             op.chapter = i
         cbox.operator("tutorial.confirm_all_chapters", text="全チャプター確認")
 
         info = StageManager.get_stage_info(props.current_chapter, props.current_stage)
         sbox = layout.box()
         sbox.label(text=info.get("title", ""))
-        max_stages_per_chapter = {1: 4, 2: 4, 3: 6, 4: 4, 5: 5, 6: 1}
-        sbox.label(text=f"ステージ {props.current_stage}/{max_stages_per_chapter.get(props.current_chapter, 1)}")
+        sbox.label(text=f"ステージ {props.current_stage}/{_MAX_STAGES[props.current_chapter]}")
         sbox.label(text=info.get("name", ""))
         sbox.separator()
         sbox.label(text=info.get("description", ""))
@@ -1381,8 +1844,12 @@ class TUTORIAL_PT_main(Panel):
         layout.operator("tutorial.reset", text="リセット")
         layout.operator("tutorial.finish_and_turn_off", text="完了（カメラ・ライトOFF）")
 
-        # draw() must be read-only: compute locally
-        stall_s = StageManager.get_stall_seconds(context)
+        # draw() must be read-only: show the value the monitoring timer keeps updated,
+        # and only compute it here when the timer is not running
+        if TUTORIAL_OT_monitoring._running:
+            stall_s = props.current_stall_seconds
+        else:
+            stall_s = StageManager.get_stall_seconds(context)
         layout.separator()
         layout.label(text=f"停滞時間: {stall_s:.1f}s / 失敗回数: {props.failed_validate_count}")
 
@@ -1391,13 +1858,13 @@ class TUTORIAL_PT_main(Panel):
 # =====================================================
 
 classes = (
-    VertexPos,
     StageRun,
     TUTORIAL_PG_Properties,
     TUTORIAL_OT_set_default_log_dir,
     TUTORIAL_OT_open_log_folder,
     TUTORIAL_OT_confirm_all_chapters,
     TUTORIAL_OT_export_stage_summary_csv,
+    TUTORIAL_OT_export_all_summaries_csv,
     TUTORIAL_OT_render_and_mark_saved,
     TUTORIAL_OT_finish_and_turn_off,
     TUTORIAL_OT_setup_stage,
@@ -1409,14 +1876,72 @@ classes = (
     TUTORIAL_PT_main,
 )
 
+LOG_FLUSH_INTERVAL = StageManager._PENDING_FLUSH_SECONDS
+
+@persistent
+def _clear_stage_caches(*_args):
+    """Drop cached UI/RNA lookups that may point into the previous file or undo state."""
+    StageManager._node_idx_cache.clear()
+    _abspath.cache_clear()
+    StageManager._cached_abs_log_path = ("", "")
+    StageManager._log_ready_for_path = ""
+    StageManager._log_dir_abs = ("", "")
+    StageManager._by_stage_path = None
+    StageManager._by_stage = {}
+    StageManager._initial_vertex_coords = None
+
+@persistent
+def _on_depsgraph_update(scene, depsgraph):
+    # node add/remove shows up as a material or node tree update
+    cache = StageManager._node_idx_cache
+    if not cache:
+        return
+    changed = set()
+    for update in depsgraph.updates:
+        if isinstance(update.id, bpy.types.NodeTree):
+            # embedded tree: owning material not known here
+            cache.clear()
+            return
+        if isinstance(update.id, bpy.types.Material):
+            changed.add(update.id.name_full)
+    if changed:
+        for key in [k for k, v in cache.items() if v[0] in changed]:
+            del cache[key]
+
+def _flush_participant_log_timer():
+    """Idle flush so buffered events reach disk even without a finalize."""
+    try:
+        StageManager.flush_participant_log()
+    except Exception:
+        pass
+    return LOG_FLUSH_INTERVAL
+
 def register():
+    register_class = bpy.utils.register_class
     for cls in classes:
-        bpy.utils.register_class(cls)
+        register_class(cls)
     bpy.types.Scene.tutorial_props = bpy.props.PointerProperty(type=TUTORIAL_PG_Properties)
+    atexit.register(StageManager.close_participant_log)
+    bpy.app.timers.register(_flush_participant_log_timer, first_interval=LOG_FLUSH_INTERVAL, persistent=True)
+    bpy.app.handlers.load_post.append(_clear_stage_caches)
+    bpy.app.handlers.undo_post.append(_clear_stage_caches)
+    bpy.app.handlers.save_post.append(_clear_stage_caches)
+    bpy.app.handlers.depsgraph_update_post.append(_on_depsgraph_update)
 
 def unregister():
+    for handlers in (bpy.app.handlers.load_post, bpy.app.handlers.undo_post, bpy.app.handlers.save_post):
+        if _clear_stage_caches in handlers:
+            handlers.remove(_clear_stage_caches)
+    if _on_depsgraph_update in bpy.app.handlers.depsgraph_update_post:
+        bpy.app.handlers.depsgraph_update_post.remove(_on_depsgraph_update)
+    _clear_stage_caches()
+    if bpy.app.timers.is_registered(_flush_participant_log_timer):
+        bpy.app.timers.unregister(_flush_participant_log_timer)
+    atexit.unregister(StageManager.close_participant_log)
+    StageManager.close_participant_log()
+    unregister_class = bpy.utils.unregister_class
     for cls in reversed(classes):
-        bpy.utils.unregister_class(cls)
+        unregister_class(cls)
     del bpy.types.Scene.tutorial_props
 
 if __name__ == "__main__":